@@ -10,6 +10,8 @@ Attributes:
     ALL_SENSORS: A special device ID which targets all sensors attached to a serial port.
 """
 
+import os
+import struct
 import time
 
 import serial
@@ -21,6 +23,7 @@ from .responses import (
     DeviceIdResponse,
     CheckFirmwareResponse,
     WorkingPeriodReadResponse,
+    _FrozenSlots,
 )
 from ._constants import (
     ALL_SENSOR_ID,
@@ -32,6 +35,9 @@ from ._constants import (
     OperationType,
     SleepState,
     ReportingMode,
+    OPERATION_TYPE_BY_INT,
+    REPORTING_MODE_BY_INT,
+    SLEEP_STATE_BY_INT,
 )
 from .exceptions import (
     IncompleteReadException,
@@ -42,7 +48,7 @@ from .exceptions import (
     MissingResponseException,
 )
 
-from typing import Protocol, Union, Optional, runtime_checkable, Generator
+from typing import Protocol, Union, Optional, runtime_checkable, Generator, List
 from dataclasses import dataclass
 from contextlib import contextmanager
 
@@ -50,6 +56,16 @@ from contextlib import contextmanager
 # leverage it.
 ALL_SENSORS: bytes = ALL_SENSOR_ID
 
+# Length of every response from the device.
+_RESPONSE_LENGTH = 10
+# Layout of a response: head, command ID, 6 byte payload, checksum, tail.
+_RESPONSE_STRUCT = struct.Struct("<BB6sBB")
+# Layout of the PM2.5 and PM10 readings in a query response, starting at offset 2.
+_QUERY_READINGS_STRUCT = struct.Struct("<HH")
+
+# Sysfs directory exposing USB-serial adapters (FTDI, CH340, etc.) on Linux.
+_USB_SERIAL_SYSFS_DIR = "/sys/bus/usb-serial/devices"
+
 
 @runtime_checkable
 class SerialLike(Protocol):
@@ -69,40 +85,69 @@ class SerialLike(Protocol):
 
 
 @dataclass(frozen=True)
-class _RawReadResponse:
+class _RawReadResponse(_FrozenSlots):
     """A raw read response object for responses from SDS011.
 
+    Only the raw data is stored; each field is sliced out of it on access, so parsing a response doesn't allocate
+    fields that are never used.
+
     Attributes:
-        head: The header bytes from the response
-        cmd_id: The command ID from the response
-        payload: The data packet bytes from the response.
-        device_id: The device ID from the response
-        checksum: The returned checksum for the response
-        tail: The tail bytes from the response
+        data: The full raw bytes of the response
         expected_command_code: The expected command code
         expected_response_type: The expected response type, either GENERAL or QUERY.
     """
 
-    head: bytes
-    cmd_id: bytes
-    payload: bytes
-    device_id: bytes
-    checksum: int
-    tail: bytes
+    # One of these is built for every response read, so avoid a per-instance __dict__.
+    __slots__ = ("data", "expected_command_code", "expected_response_type")
+
+    data: bytes
     expected_command_code: Command
     expected_response_type: ResponseType
 
+    @property
+    def head(self) -> bytes:
+        """The header bytes from the response."""
+        return self.data[0:1]
+
+    @property
+    def cmd_id(self) -> bytes:
+        """The command ID from the response."""
+        return self.data[1:2]
+
+    @property
+    def payload(self) -> bytes:
+        """The data packet bytes from the response."""
+        return self.data[2:8]
+
+    @property
+    def device_id(self) -> bytes:
+        """The device ID from the response."""
+        return self.data[6:8]
+
+    @property
+    def checksum(self) -> int:
+        """The returned checksum for the response."""
+        return self.data[8]
+
+    @property
+    def tail(self) -> bytes:
+        """The tail bytes from the response."""
+        return self.data[9:10]
+
 
 def _calc_checksum(data: bytes) -> int:
-    """Calculate the checksum for the read data."""
-    return sum(d for d in data) % 256
+    """Calculate the checksum for read or command data."""
+    return sum(data) & 0xFF
 
 
-def _verify_read_response(read_response: _RawReadResponse) -> None:
+def _verify_read_response(
+    read_response: _RawReadResponse, verify_checksum: bool = True
+) -> None:
     """Verify read data.
 
     Args:
         read_response: The raw read data to verify.
+        verify_checksum: Whether to verify the checksum of the response.
 
     Raises:
         IncorrectWrapperException: If the head or tail data is incorrect
@@ -110,16 +155,19 @@ def _verify_read_response(read_response: _RawReadResponse) -> None:
         IncorrectCommandException: If the command ID in the response is not the expected one.
         IncorrectCommandCodeException: If the command code in the response is not the expected one.
     """
-    if read_response.head != HEAD:
+    head, cmd_id, payload, checksum, tail = _RESPONSE_STRUCT.unpack(read_response.data)
+    if head != HEAD[0]:
         raise IncorrectWrapperException()
-    if read_response.tail != TAIL:
+    if tail != TAIL[0]:
         raise IncorrectWrapperException()
-    if read_response.checksum != _calc_checksum(read_response.payload):
-        raise ChecksumFailedException(
-            expected=read_response.checksum,
-            actual=_calc_checksum(read_response.payload),
-        )
-    if read_response.cmd_id != read_response.expected_response_type.value:
+    if verify_checksum:
+        calculated_checksum = _calc_checksum(payload)
+        if checksum != calculated_checksum:
+            raise ChecksumFailedException(
+                expected=calculated_checksum,
+                actual=checksum,
+            )
+    if cmd_id != read_response.expected_response_type.value[0]:
         raise IncorrectCommandException(
             expected=read_response.expected_response_type.value,
             actual=read_response.cmd_id,
@@ -128,12 +176,11 @@ def _verify_read_response(read_response: _RawReadResponse) -> None:
     # Query responses don't validate the command code
     if (
         read_response.expected_response_type != ResponseType.QUERY_RESPONSE
-        and bytes([read_response.payload[0]])
-        != read_response.expected_command_code.value
+        and payload[0] != read_response.expected_command_code.value[0]
     ):
         raise IncorrectCommandCodeException(
             expected=read_response.expected_command_code.value,
-            actual=read_response.payload[0:1],
+            actual=payload[0:1],
         )
 
 
@@ -141,6 +188,8 @@ def _parse_read_response(
     data: bytes,
     command_code: Command,
     response_type: ResponseType = ResponseType.GENERAL_RESPONSE,
+    verify: bool = True,
+    verify_checksum: bool = True,
 ) -> _RawReadResponse:
     """Parse bytes into a typed read response. Validates as well.
 
@@ -148,80 +197,115 @@ def _parse_read_response(
         data: The raw data bytes to parse.  Must be of length 10.
         command_code: The expected command code for the response.
         response_type:  The expected response type for the response.
+        verify: Whether to verify the response at all.  Only skip this for data that has already been verified.
+        verify_checksum: Whether to verify the checksum of the response.
 
     Returns:
         A read response object with the parsed data.
     """
-    if len(data) != 10:
+    if len(data) != _RESPONSE_LENGTH:
         raise IncompleteReadException()
 
-    head: bytes = data[0:1]
-    cmd_id: bytes = data[1:2]
-    payload: bytes = data[2:8]
-    device_id: bytes = data[6:8]
-    checksum: int = data[8]
-    tail: bytes = data[9:10]
-    expected_command_code: Command = command_code
-    expected_response_type: ResponseType = response_type
     result = _RawReadResponse(
-        head=head,
-        cmd_id=cmd_id,
-        payload=payload,
-        device_id=device_id,
-        checksum=checksum,
-        tail=tail,
-        expected_command_code=expected_command_code,
-        expected_response_type=expected_response_type,
+        data=data,
+        expected_command_code=command_code,
+        expected_response_type=response_type,
     )
-    _verify_read_response(result)
+    if verify:
+        _verify_read_response(result, verify_checksum=verify_checksum)
     return result
 
 
-def _parse_query_response(data: bytes) -> QueryResponse:
-    """Parse a query read response."""
-    raw_response = _parse_read_response(
-        data, Command.QUERY, ResponseType.QUERY_RESPONSE
-    )
+def _set_latency_timer(ser_dev: str, latency_timer_ms: int) -> None:
+    """Lower the USB-serial latency timer for a device, if possible.
 
-    pm25: float = int.from_bytes(raw_response.payload[0:2], byteorder="little") / 10
-    pm10: float = int.from_bytes(raw_response.payload[2:4], byteorder="little") / 10
-    return QueryResponse(pm25=pm25, pm10=pm10, device_id=raw_response.device_id)
+    Many USB-UART adapters buffer partial reads for 16ms by default before handing them to the kernel, which adds to
+    every command round trip. This is best-effort only; non-Linux systems, non-USB devices, or missing permissions
+    leave the timer untouched.
+
+    Args:
+        ser_dev: The path to the serial device.
+        latency_timer_ms: The latency timer value to set, in milliseconds.
+    """
+    device_name = os.path.basename(os.path.realpath(ser_dev))
+    latency_path = os.path.join(_USB_SERIAL_SYSFS_DIR, device_name, "latency_timer")
+    try:
+        with open(latency_path, "w") as latency_file:
+            latency_file.write(str(latency_timer_ms))
+    except OSError:
+        pass
+
+
+# The typed parsers below only ever receive data returned by `SDS011Reader._read_until_response`, which has already
+# been verified, so they skip verifying it again.
+def _parse_query_response(
+    data: bytes, last_response: Optional[QueryResponse] = None
+) -> QueryResponse:
+    """Parse a query read response.
+
+    Args:
+        data: The raw data bytes to parse.
+        last_response: The previously parsed response.  If the new reading is identical, this is returned instead of
+            allocating a new response.
+    """
+    # This is the hottest parsing path in active mode, so read straight from the data rather than going through a
+    # _RawReadResponse.
+    raw_pm25, raw_pm10 = _QUERY_READINGS_STRUCT.unpack_from(data, 2)
+    pm25: float = raw_pm25 / 10
+    pm10: float = raw_pm10 / 10
+    device_id: bytes = data[6:8]
+    if (
+        last_response is not None
+        and last_response.pm25 == pm25
+        and last_response.pm10 == pm10
+        and last_response.device_id == device_id
+    ):
+        return last_response
+    return QueryResponse(pm25=pm25, pm10=pm10, device_id=device_id)
 
 
 def _parse_reporting_mode_response(data: bytes) -> ReportingModeResponse:
     """Parse a reporting mode response."""
-    raw_response = _parse_read_response(data, command_code=Command.SET_REPORTING_MODE)
-    operation_type: OperationType = OperationType(raw_response.payload[1:2])
-    state: ReportingMode = ReportingMode(raw_response.payload[2:3])
+    raw_response = _parse_read_response(
+        data, command_code=Command.SET_REPORTING_MODE, verify=False
+    )
+    operation_type: OperationType = OPERATION_TYPE_BY_INT[raw_response.data[3]]
+    state: ReportingMode = REPORTING_MODE_BY_INT[raw_response.data[4]]
     return ReportingModeResponse(operation_type, state)
 
 
 def _parse_device_id_response(data: bytes) -> DeviceIdResponse:
     """Parse a device ID response."""
-    raw_response = _parse_read_response(data, command_code=Command.SET_DEVICE_ID)
+    raw_response = _parse_read_response(
+        data, command_code=Command.SET_DEVICE_ID, verify=False
+    )
     return DeviceIdResponse(device_id=raw_response.device_id)
 
 
 def _parse_sleep_wake_response(data: bytes) -> SleepWakeReadResponse:
     """Parse a sleep/wake response."""
-    raw_response = _parse_read_response(data, command_code=Command.SET_SLEEP)
-    operation_type: OperationType = OperationType(raw_response.payload[1:2])
-    state: SleepState = SleepState(raw_response.payload[2:3])
+    raw_response = _parse_read_response(
+        data, command_code=Command.SET_SLEEP, verify=False
+    )
+    operation_type: OperationType = OPERATION_TYPE_BY_INT[raw_response.data[3]]
+    state: SleepState = SLEEP_STATE_BY_INT[raw_response.data[4]]
     return SleepWakeReadResponse(operation_type=operation_type, state=state)
 
 
 def _parse_working_period_reponse(data: bytes) -> WorkingPeriodReadResponse:
     """Parse a working period response."""
-    raw_response = _parse_read_response(data, command_code=Command.SET_WORKING_PERIOD)
-    operation_type: OperationType = OperationType(raw_response.payload[1:2])
-    interval: int = raw_response.payload[2]
+    raw_response = _parse_read_response(
+        data, command_code=Command.SET_WORKING_PERIOD, verify=False
+    )
+    operation_type: OperationType = OPERATION_TYPE_BY_INT[raw_response.data[3]]
+    interval: int = raw_response.data[4]
     return WorkingPeriodReadResponse(operation_type=operation_type, interval=interval)
 
 
 def _parse_firmware_response(data: bytes) -> CheckFirmwareResponse:
     """Parse a firmware response."""
     raw_response = _parse_read_response(
-        data, command_code=Command.CHECK_FIRMWARE_VERSION
+        data, command_code=Command.CHECK_FIRMWARE_VERSION, verify=False
     )
     year: int = raw_response.payload[1]
     month: int = raw_response.payload[2]
@@ -229,6 +313,62 @@ def _parse_firmware_response(data: bytes) -> CheckFirmwareResponse:
     return CheckFirmwareResponse(year=year, month=month, day=day)
 
 
+def batch_parse_queries(data: bytes) -> List[QueryResponse]:
+    """Parse a buffer of back-to-back query responses.
+
+    This is useful for a bulk read of an active mode device, where the buffer is full of query responses.  The buffer
+    doesn't need to start at the beginning of a response; whenever the data doesn't line up with a valid response,
+    parsing skips ahead to the next query response header.  Responses that fail verification are skipped, as are any
+    trailing bytes that don't make up a full response.
+
+    Args:
+        data: The raw bytes to parse.
+
+    Returns:
+        The valid query responses from the buffer, in order.
+    """
+    marker = HEAD + ResponseType.QUERY_RESPONSE.value
+    head_value = HEAD[0]
+    tail_value = TAIL[0]
+    cmd_id_value = ResponseType.QUERY_RESPONSE.value[0]
+    last_start = len(data) - _RESPONSE_LENGTH
+
+    responses: List[QueryResponse] = []
+    last_response: Optional[QueryResponse] = None
+    offset = 0
+    while offset <= last_start:
+        head, cmd_id, payload, checksum, tail = _RESPONSE_STRUCT.unpack_from(
+            data, offset
+        )
+        if (
+            head != head_value
+            or tail != tail_value
+            or cmd_id != cmd_id_value
+            or checksum != _calc_checksum(payload)
+        ):
+            # Out of step with the responses, or a corrupted one.  Resync on the next header.
+            offset = data.find(marker, offset + 1)
+            if offset == -1:
+                break
+            continue
+        offset += _RESPONSE_LENGTH
+
+        raw_pm25, raw_pm10 = _QUERY_READINGS_STRUCT.unpack_from(payload)
+        device_id: bytes = payload[4:6]
+        pm25: float = raw_pm25 / 10
+        pm10: float = raw_pm10 / 10
+        # Active mode repeats readings, so share identical responses like SDS011Reader.query_data does.
+        if (
+            last_response is None
+            or last_response.pm25 != pm25
+            or last_response.pm10 != pm10
+            or last_response.device_id != device_id
+        ):
+            last_response = QueryResponse(pm25=pm25, pm10=pm10, device_id=device_id)
+        responses.append(last_response)
+    return responses
+
+
 class SDS011Reader:
     """NOVA PM SDS011 Reader."""
 
@@ -237,6 +377,8 @@ class SDS011Reader:
         ser_dev: Union[str, SerialLike],
         send_command_sleep: int = 1,
         max_loop_count: int = 30,
+        latency_timer_ms: Optional[int] = None,
+        verify_checksum: bool = True,
     ):
         """Create a basic device.
 
@@ -248,15 +390,25 @@ class SDS011Reader:
             ser_dev: A path to a serial device, or an instance of serial.Serial.
             send_command_sleep: The number of seconds to sleep after sending a command to the device.
             max_loop_count: The maximum number of reads to search through to find a desired response command.
+            latency_timer_ms: The USB-serial latency timer to set when ser_dev is a path on Linux.  This is a
+                system-wide setting for the adapter, and stays in place after the process exits.  None, the default,
+                leaves the timer untouched.
+            verify_checksum: Whether to verify the checksum of responses.  Disabling this skips a little work per
+                response, but should only be done on a trusted serial link.
         """
         if isinstance(ser_dev, str):
             self.ser: SerialLike = serial.Serial(ser_dev, timeout=2)
+            if latency_timer_ms is not None:
+                _set_latency_timer(ser_dev, latency_timer_ms)
         elif isinstance(ser_dev, SerialLike):
             self.ser = ser_dev
         else:
             raise AttributeError("ser_dev must be a string or Serial-like object.")
         self.send_command_sleep = send_command_sleep
         self.max_loop_count = max_loop_count
+        self.verify_checksum = verify_checksum
+        # Active mode repeats the same reading many times between updates, so we hold on to the last one to reuse it.
+        self._last_query: Optional[QueryResponse] = None
 
     def request_data(self, device_id: bytes = ALL_SENSORS) -> None:
         """Submit a request to the device to return pollutant data."""
@@ -270,12 +422,14 @@ class SDS011Reader:
             Pollutant data from the device.
 
         """
-        return _parse_query_response(
+        self._last_query = _parse_query_response(
             self._read_until_response(
                 expected_command=Command.QUERY,
                 response_type=ResponseType.QUERY_RESPONSE,
-            )
+            ),
+            self._last_query,
         )
+        return self._last_query
 
     def request_reporting_mode(self, device_id: bytes = ALL_SENSORS) -> None:
         """Submit a request to the device to return the current reporting mode."""
@@ -502,7 +656,8 @@ class SDS011Reader:
         if len(full_command) != 19:
             raise Exception(f"Command length must be 19, but was {len(full_command)}")
         self.ser.write(full_command)
-        time.sleep(self.send_command_sleep)
+        if self.send_command_sleep:
+            time.sleep(self.send_command_sleep)
 
     def _cmd_checksum(self, data: bytes) -> int:
         """Generate a checksum for the data bytes of a command.
@@ -516,7 +671,7 @@ class SDS011Reader:
         """
         if len(data) != 15:
             raise AttributeError("Invalid checksum length.")
-        return sum(d for d in data) % 256
+        return _calc_checksum(data)
 
     def _read_until_response(
         self,
@@ -541,13 +696,14 @@ class SDS011Reader:
 
         """
         loop_count = 0
-        while output := self.ser.read(10):
+        while output := self.ser.read(_RESPONSE_LENGTH):
             try:
                 # Validate the response
                 _parse_read_response(
                     data=output,
                     command_code=expected_command,
                     response_type=response_type,
+                    verify_checksum=self.verify_checksum,
                 )
                 return output
             except (IncorrectCommandException, IncorrectCommandCodeException):
@@ -566,15 +722,26 @@ class SDS011Reader:
 class SDS011QueryReader:
     """Reader working in query mode."""
 
-    def __init__(self, ser_dev: Union[str, SerialLike], send_command_sleep: int = 1):
+    def __init__(
+        self,
+        ser_dev: Union[str, SerialLike],
+        send_command_sleep: int = 1,
+        latency_timer_ms: Optional[int] = None,
+        verify_checksum: bool = True,
+    ):
         """Create a reader which operates exclusively in query mode.
 
         Args:
             ser_dev: A path to a serial device, or an instance of serial.Serial.
             send_command_sleep: The number of seconds to sleep after sending a command to the device.
+            latency_timer_ms: The USB-serial latency timer to set when ser_dev is a path on Linux.  See `SDS011Reader`.
+            verify_checksum: Whether to verify the checksum of responses.  See `SDS011Reader`.
         """
         self.base_reader = SDS011Reader(
-            ser_dev=ser_dev, send_command_sleep=send_command_sleep
+            ser_dev=ser_dev,
+            send_command_sleep=send_command_sleep,
+            latency_timer_ms=latency_timer_ms,
+            verify_checksum=verify_checksum,
         )
         self.base_reader.safe_wake()
         self.base_reader.set_query_mode()
@@ -721,15 +888,26 @@ class SDS011ActiveReader:
     port for each command.
     """
 
-    def __init__(self, ser_dev: Union[str, SerialLike], send_command_sleep: int = 2):
+    def __init__(
+        self,
+        ser_dev: Union[str, SerialLike],
+        send_command_sleep: int = 2,
+        latency_timer_ms: Optional[int] = None,
+        verify_checksum: bool = True,
+    ):
         """Create a reader which operates exclusively in active mode.
 
         Args:
             ser_dev: A path to a serial device, or an instance of serial.Serial.
             send_command_sleep: The number of seconds to sleep after sending a command to the device.
+            latency_timer_ms: The USB-serial latency timer to set when ser_dev is a path on Linux.  See `SDS011Reader`.
+            verify_checksum: Whether to verify the checksum of responses.  See `SDS011Reader`.
         """
         self.base_reader = SDS011Reader(
-            ser_dev=ser_dev, send_command_sleep=send_command_sleep
+            ser_dev=ser_dev,
+            send_command_sleep=send_command_sleep,
+            latency_timer_ms=latency_timer_ms,
+            verify_checksum=verify_checksum,
         )
         self.ser_dev: SerialLike = self.base_reader.ser
         self.base_reader.safe_wake()
@@ -1,5 +1,6 @@
 """Byte constants for the SDS011 device."""
 from enum import Enum
+from typing import Dict
 
 
 # Message head constant
@@ -47,6 +48,11 @@ class OperationType(Enum):
     SET_MODE = b"\x01"
 
 
+# Lookups from a single response byte (as an int) to its enum member.  These let responses be parsed without slicing out
+# a bytes object and going through the Enum constructor for every field.
+OPERATION_TYPE_BY_INT: Dict[int, OperationType] = {m.value[0]: m for m in OperationType}
+
+
 class ReportingMode(Enum):
     """Reporting mode for the device.
 
@@ -60,8 +66,14 @@ class ReportingMode(Enum):
     QUERYING = b"\x01"
 
 
+REPORTING_MODE_BY_INT: Dict[int, ReportingMode] = {m.value[0]: m for m in ReportingMode}
+
+
 class SleepState(Enum):
     """State of the device, either wake or sleep."""
 
     SLEEP = b"\x00"
     WAKE = b"\x01"
+
+
+SLEEP_STATE_BY_INT: Dict[int, SleepState] = {m.value[0]: m for m in SleepState}
@@ -13,8 +13,8 @@ class ChecksumFailedException(Sds011Exception):
     This indicates some corruption of the response.
 
     Attributes:
-        expected: The expected checksum
-        actual: The actual checksum
+        expected: The expected checksum, calculated from the response data.
+        actual: The actual checksum returned by the device.
     """
 
     def __init__(self, expected: int, actual: int):
@@ -34,10 +34,16 @@ class IncorrectCommandException(Sds011Exception):
 
     def __init__(self, expected: bytes, actual: bytes):
         """Create exception."""
-        super().__init__(f"Expected command {expected!r}, found {actual!r}")
+        # Keep the raw values in args, so repr() still shows them.  The message is only built in __str__, since these
+        # are often caught and discarded while searching for a response.
+        super().__init__(expected, actual)
         self.expected: bytes = expected
         self.actual: bytes = actual
 
+    def __str__(self) -> str:
+        """Describe the mismatched command."""
+        return f"Expected command {self.expected!r}, found {self.actual!r}"
+
 
 class IncorrectCommandCodeException(Sds011Exception):
     """Thrown if the command code in a response is incorrect.
@@ -49,10 +55,14 @@ class IncorrectCommandCodeException(Sds011Exception):
 
     def __init__(self, expected: bytes, actual: bytes):
         """Create exception."""
-        super().__init__(f"Expected code {expected!r}, found {actual!r}")
+        super().__init__(expected, actual)
         self.expected: bytes = expected
         self.actual: bytes = actual
 
+    def __str__(self) -> str:
+        """Describe the mismatched command code."""
+        return f"Expected code {self.expected!r}, found {self.actual!r}"
+
 
 class IncorrectWrapperException(Sds011Exception):
     """Thrown if the wrapper of a response (either HEAD or TAIL) is incorrect.
@@ -90,8 +100,13 @@ class MissingResponseException(Sds011Exception):
 
     def __init__(self, iteration_count: int, expected_command: bytes):
         """Create exception."""
-        super().__init__(
-            f"Tried to find command response {expected_command!r} in {iteration_count} attempts, but never did."
-        )
+        super().__init__(iteration_count, expected_command)
         self.iteration_count: int = iteration_count
         self.expected_command: bytes = expected_command
+
+    def __str__(self) -> str:
+        """Describe the missing response."""
+        return (
+            f"Tried to find command response {self.expected_command!r} in {self.iteration_count} attempts, but never "
+            "did."
+        )
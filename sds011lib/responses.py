@@ -9,10 +9,33 @@ from ._constants import (
 )
 
 from dataclasses import dataclass
+from typing import Any, Tuple
+
+# Responses are created for every reading, so they declare __slots__ to avoid a per-instance __dict__.  We can't use
+# `dataclass(slots=True)` while supporting Python 3.8, so the slots are declared by hand, and `_FrozenSlots` supplies
+# the pickling support that `slots=True` would otherwise generate.
+
+
+class _FrozenSlots:
+    """Pickle and copy support for frozen dataclasses that declare their own __slots__.
+
+    Without a __dict__, state is restored by setting each slot, which frozen dataclasses refuse.
+    """
+
+    __slots__: Tuple[str, ...] = ()
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        """Get the value of each slot."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        """Restore each slot, bypassing the frozen __setattr__."""
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
 
 
 @dataclass(frozen=True)
-class QueryResponse:
+class QueryResponse(_FrozenSlots):
     """A query read response.
 
     Attributes:
@@ -20,13 +43,15 @@ class QueryResponse:
         pm10: The PM10 reading from the device.
     """
 
+    __slots__ = ("pm25", "pm10", "device_id")
+
     pm25: float
     pm10: float
     device_id: bytes
 
 
 @dataclass(frozen=True)
-class ReportingModeResponse:
+class ReportingModeResponse(_FrozenSlots):
     """Reporting mode response.
 
     Attributes:
@@ -34,23 +59,27 @@ class ReportingModeResponse:
         state: The current reporting mode, either ACTIVE or QUERYING
     """
 
+    __slots__ = ("operation_type", "state")
+
     operation_type: OperationType
     state: ReportingMode
 
 
 @dataclass(frozen=True)
-class DeviceIdResponse:
+class DeviceIdResponse(_FrozenSlots):
     """Device ID response.
 
     Attributes:
         device_id (bytes): The 4 byte device ID.
     """
 
+    __slots__ = ("device_id",)
+
     device_id: bytes
 
 
 @dataclass(frozen=True)
-class SleepWakeReadResponse:
+class SleepWakeReadResponse(_FrozenSlots):
     """Sleep/Wake Response.
 
     Attributes:
@@ -59,12 +88,14 @@ class SleepWakeReadResponse:
 
     """
 
+    __slots__ = ("operation_type", "state")
+
     operation_type: OperationType
     state: SleepState
 
 
 @dataclass(frozen=True)
-class WorkingPeriodReadResponse:
+class WorkingPeriodReadResponse(_FrozenSlots):
     """Working period response.
 
     Attributes:
@@ -72,12 +103,14 @@ class WorkingPeriodReadResponse:
         interval: The working period interval, 0-30.  0 Indicates continuous reading.
     """
 
+    __slots__ = ("operation_type", "interval")
+
     operation_type: OperationType
     interval: int
 
 
 @dataclass(frozen=True)
-class CheckFirmwareResponse:
+class CheckFirmwareResponse(_FrozenSlots):
     """Response containing the firmware version.
 
     Attributes:
@@ -86,6 +119,8 @@ class CheckFirmwareResponse:
         day: The day of the firmware release.
     """
 
+    __slots__ = ("year", "month", "day")
+
     year: int
     month: int
     day: int
@@ -0,0 +1,53 @@
+import os
+from typing import Generator, List
+
+import pytest
+from serial import Serial
+
+from sds011lib import SDS011Reader
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--device",
+        default=os.getenv("TEST_DEVICE"),
+        help="Path to an attached SDS011 device to run integration tests against.  Defaults to $TEST_DEVICE.",
+    )
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: List[pytest.Item]
+) -> None:
+    if config.getoption("--device"):
+        return
+    skip_integration = pytest.mark.skip(reason="needs --device to run")
+    for item in items:
+        if "integration" in item.keywords:
+            item.add_marker(skip_integration)
+
+
+@pytest.fixture(scope="session")
+def device(pytestconfig: pytest.Config) -> str:
+    return str(pytestconfig.getoption("--device"))
+
+
+@pytest.fixture(scope="session")
+def _hw_serial(device: str) -> Generator[Serial, None, None]:
+    # Opening a USB serial port is slow, so every integration test shares the same one.
+    ser_dev = Serial(device, timeout=2, baudrate=9600)
+    yield ser_dev
+    # Sleep the device once all the tests are done, so its not left on.
+    if not ser_dev.is_open:
+        ser_dev.open()
+    SDS011Reader(ser_dev=ser_dev).sleep()
+    ser_dev.close()
+
+
+@pytest.fixture
+def hw_serial(_hw_serial: Serial) -> Serial:
+    # Active mode readers close the port between commands, so it may need reopening.
+    if not _hw_serial.is_open:
+        _hw_serial.open()
+    # Throw away anything left over from the previous test.
+    _hw_serial.reset_input_buffer()
+    return _hw_serial
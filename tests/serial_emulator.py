@@ -6,19 +6,19 @@ from sds011lib._constants import (
     OperationType,
     ResponseType,
     SleepState,
+    OPERATION_TYPE_BY_INT,
+    REPORTING_MODE_BY_INT,
+    SLEEP_STATE_BY_INT,
 )
-from dataclasses import dataclass
-from typing import Optional
-from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+import time
 
 
-@dataclass(frozen=True)
-class WriteData:
-    """Simple wrapper for parsed write data."""
-
-    raw_data: bytes
-    raw_body_data: bytes
-    command: Command
+# Every response starts with the HEAD and its response type, so build those prefixes once.
+_RESPONSE_PREFIXES: Dict[ResponseType, bytes] = {
+    response_type: HEAD + response_type.value for response_type in ResponseType
+}
 
 
 class Sds011SerialEmulator:
@@ -33,7 +33,7 @@ class Sds011SerialEmulator:
         Initializes to factory defaults.
         """
         super().__init__()
-        self.response_buffer = b""
+        self.response_buffer = bytearray()
         self.query_mode = ReportingMode.ACTIVE
         self.device_id = b"\x01\x01"
         self.sleep_state = SleepState.WAKE
@@ -41,7 +41,24 @@ class Sds011SerialEmulator:
         self.firmware_year = bytes([1])
         self.firmware_month = bytes([2])
         self.firmware_day = bytes([3])
-        self.last_command_time: datetime = datetime.now()
+        self.last_command_time: float = time.monotonic()
+        # Responses only change when the emulator state does, so they're built up front and rebuilt on state changes.
+        self._responses: Dict[Tuple[Command, Optional[OperationType]], bytes] = {}
+        self._rebuild_responses()
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "Sds011SerialEmulator":
+        """Copy the emulator and all of its state.
+
+        Everything but the response buffer is either immutable or replaced rather than modified, so only the buffer
+        needs copying.  The copy acts as though it just received a command, so copying a template emulator long after
+        it was created doesn't flood the copy with active mode reads.
+        """
+        copied = self.__class__.__new__(self.__class__)
+        memo[id(self)] = copied
+        copied.__dict__.update(self.__dict__)
+        copied.response_buffer = bytearray(self.response_buffer)
+        copied.last_command_time = time.monotonic()
+        return copied
 
     def open(self) -> None:
         """No-op open."""
@@ -49,7 +66,11 @@ class Sds011SerialEmulator:
 
     def close(self) -> None:
         """Resets response buffer."""
-        self.response_buffer = b""
+        self.response_buffer.clear()
+
+    def reset_input_buffer(self) -> None:
+        """Discard anything waiting to be read, like `serial.Serial.reset_input_buffer`."""
+        self.response_buffer.clear()
 
     def read(self, size: int = 1) -> bytes:
         """Read from the emulator."""
@@ -61,96 +82,121 @@ class Sds011SerialEmulator:
             # If were in active mode, and there's nothing else in there, throw some fake reads in.
             self._inject_active_mode_reads()
 
-        response = self.response_buffer[0:size]
-        self.response_buffer = self.response_buffer[size:]
+        # Copy out through a memoryview so the read only allocates the returned bytes.  The view has to be released
+        # before the buffer can be resized.
+        with memoryview(self.response_buffer) as view:
+            response = bytes(view[0:size])
+        del self.response_buffer[0:size]
         return response
 
     def _generate_read(self, response_type: ResponseType, cmd: bytes) -> bytes:
         """Generate a read command, with wrapper and checksum."""
-        cmd_and_id = cmd + self.device_id
-        return (
-            HEAD + response_type.value + cmd_and_id + read_checksum(cmd_and_id) + TAIL
-        )
+        return build_read(response_type, cmd, self.device_id)
 
     def write(self, data: bytes) -> Optional[int]:
         """Write to the emulator."""
-        last_write = parse_write_data(data)
+        if len(data) != 19:
+            raise AttributeError("Data is wrong size.")
+        command = data[2:3]
 
-        if (
-            self.sleep_state == SleepState.SLEEP
-            and last_write.command != Command.SET_SLEEP
-        ):
+        if self.sleep_state == SleepState.SLEEP and command != Command.SET_SLEEP.value:
             # Device ignores commands in sleep mode, unless its a sleep command
             return len(data)
 
-        if last_write.command == Command.SET_REPORTING_MODE:
-            operation_type = OperationType(last_write.raw_body_data[1:2])
-            if operation_type == OperationType.SET_MODE:
-                new_reporting_mode = ReportingMode(last_write.raw_body_data[2:3])
-                self._add_to_response_buffer(
-                    self._get_reporting_mode_response(
-                        new_reporting_mode, operation_type
-                    )
-                )
-                self.query_mode = new_reporting_mode
-            else:
-                self._add_to_response_buffer(
-                    self._get_reporting_mode_response(self.query_mode, operation_type)
-                )
-        elif last_write.command == Command.QUERY:
-            self._add_to_response_buffer(self._get_query_response())
-        elif last_write.command == Command.SET_DEVICE_ID:
-            self.device_id = last_write.raw_body_data[11:13]
-            self._add_to_response_buffer(self._get_device_id_response())
-        elif last_write.command == Command.SET_SLEEP:
-            operation_type = OperationType(last_write.raw_body_data[1:2])
-            if operation_type == OperationType.SET_MODE:
-                new_sleep_state = SleepState(last_write.raw_body_data[2:3])
-                self._add_to_response_buffer(
-                    self._set_sleep_response(new_sleep_state, operation_type)
-                )
-                self.sleep_state = new_sleep_state
-            else:
-                self._add_to_response_buffer(
-                    self._set_sleep_response(self.sleep_state, operation_type)
-                )
-        elif last_write.command == Command.SET_WORKING_PERIOD:
-            operation_type = OperationType(last_write.raw_body_data[1:2])
-            if operation_type == OperationType.SET_MODE:
-                new_working_period = last_write.raw_body_data[2:3]
-                self._add_to_response_buffer(
-                    self._get_working_period_response(
-                        new_working_period, operation_type
-                    )
-                )
-                self.working_period = new_working_period
-            else:
-                self._add_to_response_buffer(
-                    self._get_working_period_response(
-                        self.working_period, operation_type
-                    )
-                )
-        elif last_write.command == Command.CHECK_FIRMWARE_VERSION:
-            self._add_to_response_buffer(self._check_firmware_response())
+        handler = self._COMMAND_HANDLERS.get(command)
+        if handler is not None:
+            handler(self, data[2:15])
+        self.last_command_time = time.monotonic()
         return len(data)
 
+    def _handle_reporting_mode(self, body: bytes) -> None:
+        operation_type = OPERATION_TYPE_BY_INT[body[1]]
+        if operation_type == OperationType.SET_MODE:
+            new_reporting_mode = REPORTING_MODE_BY_INT[body[2]]
+            # The response is buffered according to the old mode, so add it before switching.
+            self._add_to_response_buffer(
+                self._get_reporting_mode_response(new_reporting_mode, operation_type)
+            )
+            self.query_mode = new_reporting_mode
+            self._rebuild_responses()
+        else:
+            self._add_to_response_buffer(
+                self._responses[(Command.SET_REPORTING_MODE, operation_type)]
+            )
+
+    def _handle_query(self, body: bytes) -> None:
+        self._add_to_response_buffer(self._get_query_response())
+
+    def _handle_device_id(self, body: bytes) -> None:
+        self.device_id = body[11:13]
+        self._rebuild_responses()
+        self._add_to_response_buffer(self._responses[(Command.SET_DEVICE_ID, None)])
+
+    def _handle_sleep(self, body: bytes) -> None:
+        operation_type = OPERATION_TYPE_BY_INT[body[1]]
+        if operation_type == OperationType.SET_MODE:
+            self.sleep_state = SLEEP_STATE_BY_INT[body[2]]
+            self._rebuild_responses()
+        self._add_to_response_buffer(
+            self._responses[(Command.SET_SLEEP, operation_type)]
+        )
+
+    def _handle_working_period(self, body: bytes) -> None:
+        operation_type = OPERATION_TYPE_BY_INT[body[1]]
+        if operation_type == OperationType.SET_MODE:
+            self.working_period = body[2:3]
+            self._rebuild_responses()
+        self._add_to_response_buffer(
+            self._responses[(Command.SET_WORKING_PERIOD, operation_type)]
+        )
+
+    def _handle_firmware_version(self, body: bytes) -> None:
+        self._add_to_response_buffer(
+            self._responses[(Command.CHECK_FIRMWARE_VERSION, None)]
+        )
+
+    def _rebuild_responses(self) -> None:
+        """Rebuild every response for the current emulator state.
+
+        Must be called whenever the device ID, reporting mode, sleep state, or working period change.  Commands
+        without an operation type are keyed with None.
+        """
+        responses: Dict[Tuple[Command, Optional[OperationType]], bytes] = {
+            (Command.QUERY, None): self._generate_read(
+                ResponseType.QUERY_RESPONSE, b"\xE5\x10\xBF\x14"
+            ),
+            (Command.SET_DEVICE_ID, None): self._get_device_id_response(),
+            (Command.CHECK_FIRMWARE_VERSION, None): self._check_firmware_response(),
+        }
+        for operation_type in OperationType:
+            responses[
+                (Command.SET_REPORTING_MODE, operation_type)
+            ] = self._get_reporting_mode_response(self.query_mode, operation_type)
+            responses[(Command.SET_SLEEP, operation_type)] = self._set_sleep_response(
+                self.sleep_state, operation_type
+            )
+            responses[
+                (Command.SET_WORKING_PERIOD, operation_type)
+            ] = self._get_working_period_response(self.working_period, operation_type)
+        self._responses = responses
+
     def _get_query_response(self) -> bytes:
-        return self._generate_read(ResponseType.QUERY_RESPONSE, b"\xE5\x10\xBF\x14")
+        return self._responses[(Command.QUERY, None)]
 
     def _add_to_response_buffer(self, data: bytes) -> None:
         if self.query_mode == ReportingMode.ACTIVE:
             self._inject_active_mode_reads()
-        self.response_buffer += data
+        self.response_buffer.extend(data)
 
     def _inject_active_mode_reads(self) -> None:
         """Inject reads when were in active mode.
 
         Always injects at least one read, but tries to inject more if there hasn't been a command in a while.
         """
-        now = datetime.now()
-        seconds_since_last_command = (now - self.last_command_time).seconds
-        for x in range(0, max(seconds_since_last_command, 1)):
-            self.response_buffer += self._get_query_response()
+        seconds_since_last_command = int(time.monotonic() - self.last_command_time)
+        self.response_buffer.extend(
+            self._get_query_response() * max(seconds_since_last_command, 1)
+        )
 
     def _get_reporting_mode_response(
         self, reporting_mode: ReportingMode, operation_type: OperationType
@@ -199,18 +245,24 @@ class Sds011SerialEmulator:
             + self.firmware_day,
         )
 
+    # Dispatch writes on the raw command byte, rather than materializing a Command for every write.
+    _COMMAND_HANDLERS: Dict[bytes, Callable[["Sds011SerialEmulator", bytes], None]] = {
+        Command.SET_REPORTING_MODE.value: _handle_reporting_mode,
+        Command.QUERY.value: _handle_query,
+        Command.SET_DEVICE_ID.value: _handle_device_id,
+        Command.SET_SLEEP.value: _handle_sleep,
+        Command.SET_WORKING_PERIOD.value: _handle_working_period,
+        Command.CHECK_FIRMWARE_VERSION.value: _handle_firmware_version,
+    }
 
-def read_checksum(data: bytes) -> bytes:
-    """Generate a checksum for the data bytes of a command."""
-    if len(data) != 6:
-        raise AttributeError("Invalid checksum length.")
-    return bytes([sum(d for d in data) % 256])
 
+@lru_cache(maxsize=None)
+def build_read(response_type: ResponseType, cmd: bytes, device_id: bytes) -> bytes:
+    """Build a full read response, with wrapper and checksum.
 
-def parse_write_data(data: bytes) -> WriteData:
-    """Parse write data from the emulator into a neater wrapper."""
-    if len(data) != 19:
-        raise AttributeError("Data is wrong size.")
-    return WriteData(
-        raw_data=data, raw_body_data=data[2:15], command=Command(data[2:3])
-    )
+    The emulator only ever produces a handful of distinct responses, so these are cached.
+    """
+    if len(cmd) + len(device_id) != 6:
+        raise AttributeError("Invalid checksum length.")
+    checksum = bytes([(sum(cmd) + sum(device_id)) & 0xFF])
+    return b"".join((_RESPONSE_PREFIXES[response_type], cmd, device_id, checksum, TAIL))
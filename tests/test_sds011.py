@@ -3,28 +3,54 @@
 Note that tests can run against both an emulated software reader, and a hardware device.  The emulator runs
 significantly faster, but obviously isn't 100% guaranteed to behave exactly like a real device.
 
-If you have a device attached, and want to run tests against it, you can set an environment variable with your test run,
-like:
+If you have a device attached, and want to run tests against it, you can pass it with your test run, like:
 
-TEST_DEVICE=/dev/ttyUSB0 pytest tests/
+pytest tests/ --device=/dev/ttyUSB0
 
-If `TEST_DEVICE` isn't set, tests will only run against the emulator.
+The `TEST_DEVICE` environment variable works too.  If neither is set, tests marked with `integration` are skipped, and
+tests will only run against the emulator.
 """
+import copy
+import io
+import pickle
+
 import pytest
 
-from sds011lib import SDS011Reader, SDS011ActiveReader, SDS011QueryReader
-from sds011lib._constants import ReportingMode, SleepState
+import sds011lib
+from sds011lib import (
+    SDS011Reader,
+    SDS011ActiveReader,
+    SDS011QueryReader,
+    batch_parse_queries,
+)
+from sds011lib._constants import (
+    Command,
+    OperationType,
+    ReportingMode,
+    ResponseType,
+    SleepState,
+)
+from sds011lib.responses import (
+    CheckFirmwareResponse,
+    DeviceIdResponse,
+    QueryResponse,
+    ReportingModeResponse,
+    SleepWakeReadResponse,
+    WorkingPeriodReadResponse,
+)
 from sds011lib.exceptions import (
     IncompleteReadException,
     ChecksumFailedException,
+    IncorrectCommandException,
+    IncorrectCommandCodeException,
     IncorrectWrapperException,
     MissingResponseException,
 )
 from .serial_emulator import Sds011SerialEmulator
-from typing import Generator, List
+from typing import Any, Callable, Optional, Type, Union
 from unittest.mock import Mock, patch
 from serial import Serial
-import os
+from pathlib import Path
 
 
 def pm25_in_range(pm25: float) -> bool:
@@ -35,22 +61,56 @@ def pm10_in_range(pm10: float) -> bool:
     return 999.9 >= pm10 >= 0.0
 
 
-def get_reader_fixtures() -> List[str]:
-    fixtures = ["emulated_reader"]
-    if os.getenv("TEST_DEVICE", None):
-        fixtures.append("integrated_reader")
-    return fixtures
+class _StubSerial:
+    """A serial device that returns a fixed payload, then nothing, as if the read timed out.
 
+    Much cheaper to build than a `Mock(spec=Serial)`, which has to introspect all of `Serial`.
+    """
+
+    def __init__(self, payload: bytes) -> None:
+        self._buffer = io.BytesIO(payload)
+
+    def read(self, size: int = 1) -> bytes:
+        return self._buffer.read(size)
+
+    def write(self, data: bytes) -> Optional[int]:
+        return len(data)
+
+    def open(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+READER_FIXTURES = [
+    "emulated_reader",
+    # There's only one device, so keep every integration test on the same xdist worker.
+    pytest.param(
+        "integrated_reader",
+        marks=[pytest.mark.integration, pytest.mark.xdist_group("serial_hw")],
+    ),
+]
+
+# Runs a test once after switching the reader to query mode, and once after switching it to active mode.
+SET_REPORTING_MODE = pytest.mark.parametrize(
+    "set_mode",
+    [SDS011Reader.set_query_mode, SDS011Reader.set_active_mode],
+    ids=["query_mode", "active_mode"],
+)
+
+
+@pytest.fixture(params=READER_FIXTURES)
+def reader(request):  # type: ignore
+    # Each test class provides its own emulated and integrated readers, this picks between them.
+    return request.getfixturevalue(request.param)
 
-class TestBaseReader:
-    @pytest.fixture
-    def reader(self, request):  # type: ignore
-        return request.getfixturevalue(request.param)
 
+class TestBaseReader:
     @pytest.fixture
-    def integrated_reader(self) -> Generator[SDS011Reader, None, None]:
+    def integrated_reader(self, hw_serial: Serial) -> SDS011Reader:
         # If you want to run these tests an integration you can replace the emulator here with a real serial device.
-        ser_dev = Serial(os.getenv("TEST_DEVICE"), timeout=2, baudrate=9600)
+        ser_dev = hw_serial
         reader = SDS011Reader(ser_dev=ser_dev)
 
         # ser_dev = Sds011SerialEmulator()
@@ -63,16 +123,16 @@ class TestBaseReader:
         # Clear everything so the reader acts as if the above commands weren't sent.
         ser_dev.reset_input_buffer()
 
-        yield reader
-        # Sleep the reader at the end so its not left on.
-        reader.sleep()
-        ser_dev.close()
+        return reader
+
+    @pytest.fixture(scope="module")
+    def emulated_template(self) -> SDS011Reader:
+        # Set up a reader against the emulator once, and hand out copies of it to each test.
+        return SDS011Reader(ser_dev=Sds011SerialEmulator(), send_command_sleep=0)
 
     @pytest.fixture
-    def emulated_reader(self) -> SDS011Reader:
-        ser_dev = Sds011SerialEmulator()
-        reader = SDS011Reader(ser_dev=ser_dev, send_command_sleep=0)
-        return reader
+    def emulated_reader(self, emulated_template: SDS011Reader) -> SDS011Reader:
+        return copy.deepcopy(emulated_template)
 
     @patch("serial.Serial")
     def test_string_constructor(self, serial_constructor: Mock) -> None:
@@ -80,7 +140,49 @@ class TestBaseReader:
         SDS011Reader("/dev/some_fake_dev")
         serial_constructor.assert_called_with("/dev/some_fake_dev", timeout=2)
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
+    @patch("serial.Serial")
+    def test_string_constructor_sets_latency_timer(
+        self,
+        serial_constructor: Mock,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        # Fake out the sysfs entry for a USB serial adapter.
+        latency_timer = tmp_path / "ttyUSB0" / "latency_timer"
+        latency_timer.parent.mkdir()
+        latency_timer.write_text("16")
+        monkeypatch.setattr(sds011lib, "_USB_SERIAL_SYSFS_DIR", str(tmp_path))
+
+        # The timer is system-wide, so it's left alone unless asked for.
+        SDS011Reader("/dev/ttyUSB0")
+        assert latency_timer.read_text() == "16"
+
+        SDS011Reader("/dev/ttyUSB0", latency_timer_ms=1)
+        assert latency_timer.read_text() == "1"
+
+        latency_timer.write_text("16")
+        SDS011Reader("/dev/ttyUSB0", latency_timer_ms=None)
+        assert latency_timer.read_text() == "16"
+
+    @pytest.mark.parametrize("reader_class", [SDS011QueryReader, SDS011ActiveReader])
+    @patch("serial.Serial")
+    def test_wrapper_string_constructor_sets_latency_timer(
+        self,
+        serial_constructor: Mock,
+        reader_class: Type[Union[SDS011QueryReader, SDS011ActiveReader]],
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        latency_timer = tmp_path / "ttyUSB0" / "latency_timer"
+        latency_timer.parent.mkdir()
+        latency_timer.write_text("16")
+        monkeypatch.setattr(sds011lib, "_USB_SERIAL_SYSFS_DIR", str(tmp_path))
+        # A silent device, so the constructor's wake and set mode commands find nothing to read.
+        serial_constructor.return_value = _StubSerial(b"")
+
+        reader_class("/dev/ttyUSB0", send_command_sleep=0, latency_timer_ms=1)
+        assert latency_timer.read_text() == "1"
+
     def test_hammer_reporting_mode(self, reader: SDS011Reader) -> None:
         # Switch the modes
         reader.set_query_mode()
@@ -96,7 +198,6 @@ class TestBaseReader:
         reader.request_reporting_mode()
         assert reader.query_reporting_mode().state == ReportingMode.QUERYING
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_hammer_sleep_query_mode(self, reader: SDS011Reader) -> None:
         reader.set_query_mode()
         reader.sleep()
@@ -111,7 +212,6 @@ class TestBaseReader:
         result = reader.query_sleep_state()
         assert result.state == SleepState.WAKE
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_hammer_sleep_active_mode(self, reader: SDS011Reader) -> None:
         reader.set_active_mode()
         reader.sleep()
@@ -121,7 +221,6 @@ class TestBaseReader:
         result = reader.query_data()
         assert result.pm25 > 0.0
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_queries_in_sleep_mode_are_incomplete(self, reader: SDS011Reader) -> None:
         # Device can't be asked anything in sleep mode.
         reader.set_query_mode()
@@ -136,7 +235,6 @@ class TestBaseReader:
         with pytest.raises(IncompleteReadException):
             reader.query_working_period()
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_values_changed_sleep_mode_arent_persisted(
         self, reader: SDS011Reader
     ) -> None:
@@ -153,7 +251,6 @@ class TestBaseReader:
         reader.request_working_period()
         assert reader.query_working_period().interval == 0
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_buffer_is_first_command(self, reader: SDS011Reader) -> None:
         reader.set_query_mode()
 
@@ -167,27 +264,23 @@ class TestBaseReader:
         result = reader.query_sleep_state()
         assert result.state == SleepState.WAKE
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_get_reporting_mode_query(self, reader: SDS011Reader) -> None:
         reader.set_query_mode()
         reader.request_reporting_mode()
         result = reader.query_reporting_mode()
         assert result.state == ReportingMode.QUERYING
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_get_reporting_mode_active(self, reader: SDS011Reader) -> None:
         reader.set_active_mode()
         result = reader.query_reporting_mode()
         assert result.state == ReportingMode.ACTIVE
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_query_active_mode(self, reader: SDS011Reader) -> None:
         reader.set_active_mode()
         result = reader.query_data()
         assert pm25_in_range(result.pm25)
         assert pm10_in_range(result.pm10)
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_query_query_mode(self, reader: SDS011Reader) -> None:
         reader.set_query_mode()
         reader.request_data()
@@ -195,22 +288,53 @@ class TestBaseReader:
         assert pm25_in_range(result.pm25)
         assert pm10_in_range(result.pm10)
 
-    def test_query_emulated(self) -> None:
+    def test_query_emulated(self, emulated_reader: SDS011Reader) -> None:
         # Since the emulator always returns the same values, this lets us assert that the result is an exact number,
         # instead of a range.  Its possible that we might have a bug if all we do is check range, since we might be
         # checking the wrong byte data.
-        ser_dev = Sds011SerialEmulator()
-        reader = SDS011Reader(ser_dev=ser_dev, send_command_sleep=0)
+        reader = emulated_reader
         reader.set_query_mode()
         reader.request_data()
         result = reader.query_data()
         assert result.pm25 == 432.5
         assert result.pm10 == 531.1
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_set_device_id_query_mode(self, reader: SDS011Reader) -> None:
+    def test_query_emulated_reuses_unchanged_response(
+        self, emulated_reader: SDS011Reader
+    ) -> None:
+        reader = emulated_reader
+        reader.set_query_mode()
+        reader.request_data()
+        result = reader.query_data()
+        reader.request_data()
+        assert reader.query_data() is result
+
+        # A new device ID means a new reading.
+        reader.set_device_id(b"\x12\x23")
+        reader.query_device_id()
+        reader.request_data()
+        result2 = reader.query_data()
+        assert result2 is not result
+        assert result2.device_id == b"\x12\x23"
+
+    def test_deepcopy_after_query(self, emulated_reader: SDS011Reader) -> None:
+        # The reader holds on to its last response, which has to survive being copied.
+        emulated_reader.set_query_mode()
+        emulated_reader.request_data()
+        result = emulated_reader.query_data()
+
+        copied = copy.deepcopy(emulated_reader)
+        copied.request_data()
+        assert copied.query_data() == result
+
+    def test_set_device_id_query_mode(
+        self, reader: SDS011Reader, request: pytest.FixtureRequest
+    ) -> None:
         new_device_id = b"\xbb\xaa"
         reader.set_query_mode()
+        reader.request_data()
+        original_device_id = reader.query_data().device_id
+        request.addfinalizer(lambda: reader.set_device_id(original_device_id))
         reader.set_device_id(new_device_id)
         result = reader.query_device_id()
         assert result.device_id == new_device_id
@@ -220,7 +344,6 @@ class TestBaseReader:
         result2 = reader.query_data()
         assert result2.device_id == new_device_id
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_set_device_id_wrong_size(self, reader: SDS011Reader) -> None:
         reader.set_query_mode()
         with pytest.raises(AttributeError):
@@ -229,57 +352,34 @@ class TestBaseReader:
         with pytest.raises(AttributeError):
             reader.set_device_id(b"\xbb")
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_sleep_query_mode(self, reader: SDS011Reader) -> None:
         reader.set_query_mode()
         reader.sleep()
         result = reader.query_sleep_state()
         assert result.state == SleepState.SLEEP
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_sleep_active_mode(self, reader: SDS011Reader) -> None:
         reader.set_active_mode()
         reader.sleep()
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_wake_query_mode(self, reader: SDS011Reader) -> None:
-        reader.set_query_mode()
-        reader.wake()
-        result = reader.query_sleep_state()
-        assert result.state == SleepState.WAKE
-
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_wake_active_mode(self, reader: SDS011Reader) -> None:
-        reader.set_active_mode()
-        reader.wake()
-
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_get_sleep_state_query_mode(self, reader: SDS011Reader) -> None:
-        reader.set_query_mode()
-        reader.wake()
-        result = reader.query_sleep_state()
-        assert result.state == SleepState.WAKE
-
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_get_sleep_state_active_mode(self, reader: SDS011Reader) -> None:
-        reader.set_active_mode()
+    @SET_REPORTING_MODE
+    def test_get_sleep_state(
+        self, reader: SDS011Reader, set_mode: Callable[[SDS011Reader], None]
+    ) -> None:
+        set_mode(reader)
         reader.wake()
         result = reader.query_sleep_state()
         assert result.state == SleepState.WAKE
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_set_working_period_query_mode(self, reader: SDS011Reader) -> None:
-        reader.set_query_mode()
+    @SET_REPORTING_MODE
+    def test_set_working_period(
+        self, reader: SDS011Reader, set_mode: Callable[[SDS011Reader], None]
+    ) -> None:
+        set_mode(reader)
         reader.set_working_period(10)
         result = reader.query_working_period()
         assert result.interval == 10
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_set_working_period_active_mode(self, reader: SDS011Reader) -> None:
-        reader.set_active_mode()
-        reader.set_working_period(10)
-
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_set_working_period_invalid_setting(self, reader: SDS011Reader) -> None:
         reader.set_query_mode()
         with pytest.raises(AttributeError):
@@ -288,42 +388,25 @@ class TestBaseReader:
         with pytest.raises(AttributeError):
             reader.set_working_period(-1)
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_get_working_period_query_mode(self, reader: SDS011Reader) -> None:
-        reader.set_query_mode()
-        reader.set_working_period(10)
-        result = reader.query_working_period()
-        assert result.interval == 10
-
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_get_working_period_active_mode(self, reader: SDS011Reader) -> None:
-        reader.set_active_mode()
-        reader.set_working_period(10)
-        result = reader.query_working_period()
-        assert result.interval == 10
-
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_get_firmware_version_query_mode(self, reader: SDS011Reader) -> None:
-        reader.set_query_mode()
-        reader.request_firmware_version()
-        result = reader.query_firmware_version()
-        assert 99 >= result.year >= 0
-        assert 12 >= result.month >= 1
-        assert 31 >= result.day >= 1
-
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_get_firmware_version_active_mode(self, reader: SDS011Reader) -> None:
-        reader.set_active_mode()
+    @SET_REPORTING_MODE
+    def test_get_firmware_version(
+        self, reader: SDS011Reader, set_mode: Callable[[SDS011Reader], None]
+    ) -> None:
+        set_mode(reader)
         reader.request_firmware_version()
         result = reader.query_firmware_version()
         assert 99 >= result.year >= 0
         assert 12 >= result.month >= 1
         assert 31 >= result.day >= 1
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_throws_if_missing_response(self, reader: SDS011Reader) -> None:
+    def test_throws_if_missing_response(
+        self, reader: SDS011Reader, request: pytest.FixtureRequest
+    ) -> None:
         # Set query mode just to make it easier.
         reader.set_query_mode()
+        reader.request_data()
+        original_device_id = reader.query_data().device_id
+        request.addfinalizer(lambda: reader.set_device_id(original_device_id))
         reader.request_reporting_mode()
         # flush the device just in case stuff from active mode is leftover
         reader.ser.close()
@@ -339,127 +422,152 @@ class TestBaseReader:
         reader.request_data()
 
         # Command should be 4 back.
-        with pytest.raises(MissingResponseException):
+        with pytest.raises(MissingResponseException, match="in 3 attempts"):
             reader.query_data()
 
     def test_raises_if_not_serial_or_string(self) -> None:
         with pytest.raises(AttributeError):
             SDS011Reader(1234)  # type: ignore
 
-    def test_bad_checksum(self) -> None:
-        ser_dev = Mock(spec=Serial)
-        ser_dev.read.side_effect = [b"\xaa\x01\x01\x01\x01\x01\x01\x01\x03\xab"]
-        reader = SDS011Reader(ser_dev=ser_dev, send_command_sleep=0)
+    @patch("sds011lib.time.sleep")
+    def test_send_command_sleeps(self, sleep: Mock) -> None:
+        reader = SDS011Reader(ser_dev=Sds011SerialEmulator(), send_command_sleep=3)
+        reader.request_data()
+        sleep.assert_called_once_with(3)
 
-        with pytest.raises(ChecksumFailedException):
-            reader.query_data()
+    @patch("sds011lib.time.sleep")
+    def test_send_command_skips_sleep_when_zero(
+        self, sleep: Mock, emulated_reader: SDS011Reader
+    ) -> None:
+        # Emulated readers never sleep, so make sure they don't even make the call.
+        emulated_reader.request_data()
+        sleep.assert_not_called()
 
-    def test_bad_wrapper_head(self) -> None:
-        ser_dev = Mock(spec=Serial)
-        # Set the head to be the wrong value
-        ser_dev.read.side_effect = [b"\xab\x01\x01\x01\x01\x01\x01\x01\x03\xab"]
+    def test_bad_checksum(self) -> None:
+        ser_dev = _StubSerial(b"\xaa\x01\x01\x01\x01\x01\x01\x01\x03\xab")
         reader = SDS011Reader(ser_dev=ser_dev, send_command_sleep=0)
 
-        with pytest.raises(IncorrectWrapperException):
+        with pytest.raises(ChecksumFailedException) as exc_info:
             reader.query_data()
+        assert exc_info.value.expected == 6
+        assert exc_info.value.actual == 3
 
-    def test_bad_wrapper_tail(self) -> None:
-        ser_dev = Mock(spec=Serial)
-        # Set the tail to be the wrong value
-        ser_dev.read.side_effect = [b"\xaa\x01\x01\x01\x01\x01\x01\x01\x03\xac"]
-        reader = SDS011Reader(ser_dev=ser_dev, send_command_sleep=0)
-
-        with pytest.raises(IncorrectWrapperException):
-            reader.query_data()
+    def test_bad_checksum_unverified(self) -> None:
+        ser_dev = _StubSerial(b"\xaa\xc0\x01\x01\x01\x01\x01\x01\x03\xab")
+        reader = SDS011Reader(
+            ser_dev=ser_dev, send_command_sleep=0, verify_checksum=False
+        )
 
-    def test_incomplete_read(self) -> None:
-        ser_dev = Mock(spec=Serial)
-        # Give back less than 10 bytes
-        ser_dev.read.side_effect = [b"\xaa\x01\x01\x01\x01\x01"]
-        reader = SDS011Reader(ser_dev=ser_dev, send_command_sleep=0)
+        result = reader.query_data()
+        assert result.pm25 == 25.7
+        assert result.pm10 == 25.7
 
-        with pytest.raises(IncompleteReadException):
-            reader.query_data()
+    @pytest.mark.parametrize("reader_class", [SDS011QueryReader, SDS011ActiveReader])
+    def test_wrapper_passes_verify_checksum(
+        self, reader_class: Type[Union[SDS011QueryReader, SDS011ActiveReader]]
+    ) -> None:
+        reader = reader_class(
+            _StubSerial(b""), send_command_sleep=0, verify_checksum=False
+        )
+        assert reader.base_reader.verify_checksum is False
 
-    def test_set_active_mode_ignores_incomplete_reads(self) -> None:
-        ser_dev = Mock(spec=Serial)
-        # Give back less than 10 bytes
-        ser_dev.read.side_effect = [b"\xaa\x01\x01\x01\x01\x01"]
-        reader = SDS011Reader(ser_dev=ser_dev, send_command_sleep=0)
+    def test_incomplete_reads_raise_fresh_exceptions(self) -> None:
+        reader = SDS011Reader(ser_dev=_StubSerial(b""), send_command_sleep=0)
 
         try:
-            reader.set_active_mode()
-        except Exception:
-            pytest.fail("Unexpected exception")
+            raise KeyError("unrelated")
+        except KeyError:
+            with pytest.raises(IncompleteReadException) as first:
+                reader.query_data()
+        with pytest.raises(IncompleteReadException) as second:
+            reader.query_data()
 
-    def test_set_query_mode_ignores_incomplete_reads(self) -> None:
-        ser_dev = Mock(spec=Serial)
-        # Give back less than 10 bytes
-        ser_dev.read.side_effect = [b"\xaa\x01\x01\x01\x01\x01"]
-        reader = SDS011Reader(ser_dev=ser_dev, send_command_sleep=0)
+        # Each raise should get its own exception, without the context of an earlier one.
+        assert first.value is not second.value
+        assert second.value.__context__ is None
+
+    @pytest.mark.parametrize(
+        "payload,exception",
+        [
+            # Head is the wrong value.
+            (b"\xab\x01\x01\x01\x01\x01\x01\x01\x03\xab", IncorrectWrapperException),
+            # Tail is the wrong value.
+            (b"\xaa\x01\x01\x01\x01\x01\x01\x01\x03\xac", IncorrectWrapperException),
+            # Less than 10 bytes.
+            (b"\xaa\x01\x01\x01\x01\x01", IncompleteReadException),
+        ],
+        ids=["bad_wrapper_head", "bad_wrapper_tail", "incomplete_read"],
+    )
+    def test_query_data_raises_on_bad_read(
+        self, payload: bytes, exception: Type[Exception]
+    ) -> None:
+        reader = SDS011Reader(ser_dev=_StubSerial(payload), send_command_sleep=0)
 
-        try:
-            reader.set_query_mode()
-        except Exception:
-            pytest.fail("Unexpected exception")
+        with pytest.raises(exception):
+            reader.query_data()
 
-    def test_set_query_mode_ignores_incorrect_command(self) -> None:
-        ser_dev = Mock(spec=Serial)
-        # Give a query mode command instead
-        ser_dev.read.side_effect = [b"\xaa\xc0\x01\x01\x01\x01\x01\x01\x06\xab"]
-        reader = SDS011Reader(ser_dev=ser_dev, send_command_sleep=0)
+    @pytest.mark.parametrize(
+        "payload,set_mode",
+        [
+            # Less than 10 bytes.
+            (b"\xaa\x01\x01\x01\x01\x01", SDS011Reader.set_active_mode),
+            (b"\xaa\x01\x01\x01\x01\x01", SDS011Reader.set_query_mode),
+            # A query response instead of a reporting mode response.
+            (b"\xaa\xc0\x01\x01\x01\x01\x01\x01\x06\xab", SDS011Reader.set_query_mode),
+        ],
+        ids=[
+            "active_mode_incomplete_read",
+            "query_mode_incomplete_read",
+            "query_mode_incorrect_command",
+        ],
+    )
+    def test_set_mode_ignores_bad_read(
+        self, payload: bytes, set_mode: Callable[[SDS011Reader], None]
+    ) -> None:
+        reader = SDS011Reader(ser_dev=_StubSerial(payload), send_command_sleep=0)
 
         try:
-            reader.set_query_mode()
+            set_mode(reader)
         except Exception:
             pytest.fail("Unexpected exception")
 
 
 class TestActiveModeReader:
     @pytest.fixture
-    def reader(self, request):  # type: ignore
-        return request.getfixturevalue(request.param)
-
-    @pytest.fixture
-    def integrated_reader(self) -> Generator[SDS011ActiveReader, None, None]:
+    def integrated_reader(self, hw_serial: Serial) -> SDS011ActiveReader:
         # If you want to run these tests an integration you can replace the emulator here with a real serial device.
-        ser_dev = Serial(os.getenv("TEST_DEVICE"), timeout=2, baudrate=9600)
+        ser_dev = hw_serial
         reader = SDS011ActiveReader(ser_dev=ser_dev, send_command_sleep=5)
 
         # ser_dev = Sds011SerialEmulator()
         # reader = SDS011ActiveReader(ser_dev=ser_dev, send_command_sleep=0)
         reader.set_working_period(0)
-        reader.set_device_id(b"\xaa\xaa")
+        # Rather than resetting the device ID before every test, the tests that change it put it back afterwards.
 
-        yield reader
-        try:
-            # Sleep the reader at the end so its not left on.
-            reader.sleep()
-        except IncompleteReadException:
-            # Can't re-sleep if were already asleep.
-            pass
-        ser_dev.close()
+        return reader
+
+    @pytest.fixture(scope="module")
+    def emulated_template(self) -> SDS011ActiveReader:
+        # Set up a reader against the emulator once, and hand out copies of it to each test.
+        return SDS011ActiveReader(ser_dev=Sds011SerialEmulator(), send_command_sleep=0)
 
     @pytest.fixture
-    def emulated_reader(self) -> SDS011ActiveReader:
-        ser_dev = Sds011SerialEmulator()
-        reader = SDS011ActiveReader(ser_dev=ser_dev, send_command_sleep=0)
-        return reader
+    def emulated_reader(
+        self, emulated_template: SDS011ActiveReader
+    ) -> SDS011ActiveReader:
+        return copy.deepcopy(emulated_template)
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_query(self, reader: SDS011ActiveReader) -> None:
         result = reader.query()
         assert pm25_in_range(result.pm25)
         assert pm10_in_range(result.pm10)
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_query_sleep_mode(self, reader: SDS011ActiveReader) -> None:
         reader.sleep()
 
         with pytest.raises(IncompleteReadException):
             reader.query()
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_wake(self, reader: SDS011ActiveReader) -> None:
         reader.sleep()
         with pytest.raises(IncompleteReadException):
@@ -471,13 +579,15 @@ class TestActiveModeReader:
         assert pm25_in_range(result.pm25)
         assert pm10_in_range(result.pm10)
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_set_working_period(self, reader: SDS011ActiveReader) -> None:
         result = reader.set_working_period(20)
         assert result.interval == 20
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_set_device_id(self, reader: SDS011ActiveReader) -> None:
+    def test_set_device_id(
+        self, reader: SDS011ActiveReader, request: pytest.FixtureRequest
+    ) -> None:
+        original_device_id = reader.query().device_id
+        request.addfinalizer(lambda: reader.set_device_id(original_device_id))
         result = reader.set_device_id(b"\x12\x23")
 
         assert result.device_id == b"\x12\x23"
@@ -489,44 +599,39 @@ class TestActiveModeReader:
 
 class TestQueryModeReader:
     @pytest.fixture
-    def reader(self, request):  # type: ignore
-        return request.getfixturevalue(request.param)
-
-    @pytest.fixture
-    def integrated_reader(self) -> Generator[SDS011QueryReader, None, None]:
+    def integrated_reader(self, hw_serial: Serial) -> SDS011QueryReader:
         # If you want to run these tests an integration you can replace the emulator here with a real serial device.
-        ser_dev = Serial(os.getenv("TEST_DEVICE"), timeout=2, baudrate=9600)
+        ser_dev = hw_serial
         reader = SDS011QueryReader(ser_dev=ser_dev)
 
         # ser_dev = Sds011SerialEmulator()
         # reader = SDS011QueryReader(ser_dev=ser_dev, send_command_sleep=0)
         reader.set_working_period(0)
 
-        yield reader
-        # Sleep the reader at the end so its not left on.
-        reader.base_reader.sleep()
-        ser_dev.close()
+        return reader
+
+    @pytest.fixture(scope="module")
+    def emulated_template(self) -> SDS011QueryReader:
+        # Set up a reader against the emulator once, and hand out copies of it to each test.
+        return SDS011QueryReader(ser_dev=Sds011SerialEmulator(), send_command_sleep=0)
 
     @pytest.fixture
-    def emulated_reader(self) -> SDS011QueryReader:
-        ser_dev = Sds011SerialEmulator()
-        reader = SDS011QueryReader(ser_dev=ser_dev, send_command_sleep=0)
-        return reader
+    def emulated_reader(
+        self, emulated_template: SDS011QueryReader
+    ) -> SDS011QueryReader:
+        return copy.deepcopy(emulated_template)
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_query(self, reader: SDS011QueryReader) -> None:
         result = reader.query()
         assert pm25_in_range(result.pm25)
         assert pm10_in_range(result.pm10)
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_query_sleep_mode(self, reader: SDS011QueryReader) -> None:
         reader.sleep()
 
         with pytest.raises(IncompleteReadException):
             reader.query()
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_wake(self, reader: SDS011QueryReader) -> None:
         reader.sleep()
         with pytest.raises(IncompleteReadException):
@@ -538,7 +643,6 @@ class TestQueryModeReader:
         assert pm25_in_range(result2.pm25)
         assert pm10_in_range(result2.pm10)
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_get_sleep_state(self, reader: SDS011QueryReader) -> None:
         result = reader.sleep()
         assert result.state == SleepState.SLEEP
@@ -554,24 +658,24 @@ class TestQueryModeReader:
         assert pm25_in_range(result2.pm25)
         assert pm10_in_range(result2.pm10)
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_get_reporting_mode(self, reader: SDS011QueryReader) -> None:
         result = reader.get_reporting_mode()
         assert result.state == ReportingMode.QUERYING
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_set_working_period(self, reader: SDS011QueryReader) -> None:
         result = reader.set_working_period(20)
         assert result.interval == 20
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_get_working_period(self, reader: SDS011QueryReader) -> None:
         reader.set_working_period(20)
         result = reader.get_working_period()
         assert result.interval == 20
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
-    def test_set_device_id(self, reader: SDS011QueryReader) -> None:
+    def test_set_device_id(
+        self, reader: SDS011QueryReader, request: pytest.FixtureRequest
+    ) -> None:
+        original_device_id = reader.query().device_id
+        request.addfinalizer(lambda: reader.set_device_id(original_device_id))
         result = reader.set_device_id(b"\x12\x23")
         assert result.device_id == b"\x12\x23"
 
@@ -579,9 +683,94 @@ class TestQueryModeReader:
         result2 = reader.query()
         assert result2.device_id == b"\x12\x23"
 
-    @pytest.mark.parametrize("reader", get_reader_fixtures(), indirect=True)
     def test_get_firmware_version(self, reader: SDS011QueryReader) -> None:
         result = reader.get_firmware_version()
         assert 99 >= result.year >= 0
         assert 12 >= result.month >= 1
         assert 31 >= result.day >= 1
+
+
+class TestBatchParseQueries:
+    @pytest.fixture
+    def good(self) -> bytes:
+        # The emulator starts in active mode, so reads return query responses.
+        return Sds011SerialEmulator().read(10)
+
+    def test_parse(self, good: bytes) -> None:
+        corrupted = good[:8] + bytes([(good[8] + 1) & 0xFF]) + good[9:]
+
+        results = batch_parse_queries(good + corrupted + good + good[:4])
+        assert len(results) == 2
+        assert results[0].pm25 == 432.5
+        assert results[0].pm10 == 531.1
+        assert results[0].device_id == b"\x01\x01"
+        # Identical readings share a response.
+        assert results[1] is results[0]
+
+    def test_misaligned_start(self, good: bytes) -> None:
+        # Like a port opened partway through a response.
+        results = batch_parse_queries(good[3:] + good + good)
+        assert len(results) == 2
+        assert results[0].pm25 == 432.5
+
+        assert len(batch_parse_queries(b"\x00" + good * 2)) == 2
+
+    def test_stray_bytes_between_responses(self, good: bytes) -> None:
+        assert len(batch_parse_queries(good + b"\x00\xaa\x00" + good)) == 2
+
+    def test_wrong_command_id(self, good: bytes) -> None:
+        # A general response, which has the right wrapper and a valid checksum, but isn't a query response.
+        general = good[:1] + ResponseType.GENERAL_RESPONSE.value + good[2:]
+
+        results = batch_parse_queries(general + good)
+        assert len(results) == 1
+        assert results[0].pm25 == 432.5
+
+
+class TestResponses:
+    @pytest.mark.parametrize(
+        "response",
+        [
+            QueryResponse(pm25=432.5, pm10=531.1, device_id=b"\x01\x01"),
+            ReportingModeResponse(
+                operation_type=OperationType.QUERY, state=ReportingMode.ACTIVE
+            ),
+            DeviceIdResponse(device_id=b"\x01\x01"),
+            SleepWakeReadResponse(
+                operation_type=OperationType.SET_MODE, state=SleepState.SLEEP
+            ),
+            WorkingPeriodReadResponse(operation_type=OperationType.QUERY, interval=5),
+            CheckFirmwareResponse(year=1, month=2, day=3),
+            sds011lib._RawReadResponse(
+                data=b"\xaa\xc0\xe5\x10\xbf\x14\x01\x01\xba\xab",
+                expected_command_code=Command.QUERY,
+                expected_response_type=ResponseType.QUERY_RESPONSE,
+            ),
+        ],
+        ids=lambda response: type(response).__name__,
+    )
+    def test_round_trip(self, response: Any) -> None:
+        assert pickle.loads(pickle.dumps(response)) == response
+        assert copy.copy(response) == response
+        assert copy.deepcopy(response) == response
+
+
+class TestExceptions:
+    def test_incorrect_command(self) -> None:
+        exception = IncorrectCommandException(expected=b"\xc5", actual=b"\xc0")
+        assert str(exception) == "Expected command b'\\xc5', found b'\\xc0'"
+        assert repr(exception) == "IncorrectCommandException(b'\\xc5', b'\\xc0')"
+
+    def test_incorrect_command_code(self) -> None:
+        exception = IncorrectCommandCodeException(expected=b"\x06", actual=b"\x02")
+        assert str(exception) == "Expected code b'\\x06', found b'\\x02'"
+        assert repr(exception) == "IncorrectCommandCodeException(b'\\x06', b'\\x02')"
+
+    def test_missing_response(self) -> None:
+        exception = MissingResponseException(
+            iteration_count=3, expected_command=b"\x06"
+        )
+        assert str(exception) == (
+            "Tried to find command response b'\\x06' in 3 attempts, but never did."
+        )
+        assert repr(exception) == "MissingResponseException(3, b'\\x06')"